@@ -4,14 +4,25 @@
 from __future__ import annotations
 
 import argparse
+import bisect
+import functools
 import json
+import logging
 import pathlib
 import re
 import sys
 import urllib.error
 import urllib.request
-from collections import Counter, deque
+from collections import deque
+from collections.abc import Sequence
 from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import TextIO
+
+# Codegen diagnostics (INFO keyword renames, WARNING for the rest). Running the
+# script routes them to stdout; library callers attach their own handler and
+# can rely on the per-category counts returned by generate_protocol_header.
+logger = logging.getLogger("lsp_codegen")
 
 # Keep compact form stable; do not run formatter inside this block.
 # fmt: off
@@ -51,9 +62,53 @@ SUSPICIOUS_BOOL_PATTERNS = [
     re.compile(r"if\s+omitted[^.\n]*true", re.IGNORECASE),
     re.compile(r"when\s+omitted[^.\n]*true", re.IGNORECASE),
 ]
+# Single alternation so each documentation string is scanned once.
+SUSPICIOUS_BOOL_RE = re.compile(
+    "|".join(f"(?:{pattern.pattern})" for pattern in SUSPICIOUS_BOOL_PATTERNS),
+    re.IGNORECASE,
+)
+
+# Tags that documentation may already mention, matched in a single pass.
+DOC_TAG_RE = re.compile(
+    r"\b@?(?:(?P<since_tags>sinceTags)|(?P<since>since)"
+    r"|(?P<deprecated>deprecated)|(?P<proposed>proposed))\b",
+    re.IGNORECASE,
+)
+
+# `\W` is exactly the complement of `c.isalnum() or c == "_"`.
+_NON_WORD_CHAR_RE = re.compile(r"\W")
+_NON_IDENT_RE = re.compile(r"[^0-9A-Za-z_]+")
+
+# Method names are ASCII in practice; map every ASCII separator to a space so
+# a plain `str.split()` replaces splitting on `[^0-9A-Za-z]+`.
+_METHOD_SEPARATOR_TABLE = str.maketrans(
+    {chr(c): " " for c in range(128) if not chr(c).isalnum()}
+)
+_METHOD_SEPARATOR_RE = re.compile(r"[^0-9A-Za-z]+")
+
+# Enum underlying-type selection, narrowest first. Anything beyond the last
+# bound falls through to the 64-bit type.
+_UNSIGNED_BOUNDS = (0xFF, 0xFFFF, 0xFFFFFFFF)
+_UNSIGNED_TYPES = ("std::uint8_t", "std::uint16_t", "std::uint32_t", "std::uint64_t")
+_SIGNED_RANGES = (
+    (-(1 << 7), (1 << 7) - 1, "std::int8_t"),
+    (-(1 << 15), (1 << 15) - 1, "std::int16_t"),
+    (-(1 << 31), (1 << 31) - 1, "std::int32_t"),
+)
+
+
+class NodeKind(IntEnum):
+    # Values follow the historical "A" < "E" < "S" tag order so that the
+    # deterministic emission order of the generated header is unchanged.
+    ALIAS = 0
+    ENUM = 1
+    STRUCT = 2
 
 
-@dataclass
+NodeKey = tuple[NodeKind, str]
+
+
+@dataclass(slots=True)
 class DocInfo:
     documentation: str | None = None
     since: str | None = None
@@ -62,7 +117,7 @@ class DocInfo:
     proposed: bool = False
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PropertyDef:
     name: str
     type_expr: dict
@@ -70,7 +125,7 @@ class PropertyDef:
     doc: DocInfo
 
 
-@dataclass
+@dataclass(slots=True)
 class StructDef:
     name: str
     parents: list[str]
@@ -78,14 +133,14 @@ class StructDef:
     doc: DocInfo
 
 
-@dataclass
+@dataclass(slots=True)
 class EnumValueDef:
     name: str
     value: str | int
     doc: DocInfo
 
 
-@dataclass
+@dataclass(slots=True)
 class EnumDef:
     name: str
     type_expr: dict
@@ -94,14 +149,14 @@ class EnumDef:
     doc: DocInfo
 
 
-@dataclass
+@dataclass(slots=True)
 class AliasDef:
     name: str
     type_expr: dict
     doc: DocInfo
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RequestDef:
     method: str
     type_name: str | None
@@ -110,7 +165,7 @@ class RequestDef:
     doc: DocInfo
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class NotificationDef:
     method: str
     type_name: str | None
@@ -118,28 +173,33 @@ class NotificationDef:
     doc: DocInfo
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ExtraParamDef:
     name: str
     method: str
 
 
-@dataclass
+@dataclass(slots=True)
 class SchemaModel:
     structures: dict[str, StructDef]
     enumerations: dict[str, EnumDef]
     aliases: dict[str, AliasDef]
     requests: list[RequestDef]
     notifications: list[NotificationDef]
+    struct_names: frozenset[str]
+    enum_names: frozenset[str]
+    alias_names: frozenset[str]
+    closed_string_enum_names: frozenset[str]
+    closed_string_literal_owner: dict[str, str]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class FlattenedProperty:
     prop: PropertyDef
     declared_in: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class MemberDef:
     cxx_type: str
     base_name: str
@@ -147,12 +207,17 @@ class MemberDef:
     default_value: str | None
 
 
+@functools.cache
 def camel_to_snake(name: str) -> str:
+    # Already snake/lower case names have no boundaries to split on.
+    if name.islower():
+        return name
     out: list[str] = []
+    last = len(name) - 1
     for i, c in enumerate(name):
         if c.isupper():
             if i > 0 and (
-                name[i - 1].islower() or (i + 1 < len(name) and name[i + 1].islower())
+                name[i - 1].islower() or (i < last and name[i + 1].islower())
             ):
                 out.append("_")
             out.append(c.lower())
@@ -161,9 +226,9 @@ def camel_to_snake(name: str) -> str:
     return "".join(out)
 
 
+@functools.cache
 def sanitize_identifier(name: str, fallback: str = "value") -> tuple[str, bool]:
-    chars = [c if c.isalnum() or c == "_" else "_" for c in name]
-    text = "".join(chars).strip("_")
+    text = _NON_WORD_CHAR_RE.sub("_", name).strip("_")
     if not text:
         text = fallback
     if text[0].isdigit():
@@ -176,9 +241,9 @@ def sanitize_identifier(name: str, fallback: str = "value") -> tuple[str, bool]:
     return text, keyword_hit
 
 
+@functools.cache
 def sanitize_type_identifier(name: str, fallback: str = "Type") -> str:
-    chars = [c if c.isalnum() or c == "_" else "_" for c in name]
-    text = "".join(chars)
+    text = _NON_WORD_CHAR_RE.sub("_", name)
     if not text:
         text = fallback
     if text[0].isdigit():
@@ -190,8 +255,9 @@ def sanitize_type_identifier(name: str, fallback: str = "Type") -> str:
     return text
 
 
+@functools.cache
 def enum_member_upper_camel(text: str, fallback: str) -> str:
-    normalized = re.sub(r"[^0-9A-Za-z_]+", "_", text)
+    normalized = _NON_IDENT_RE.sub("_", text)
     snake = camel_to_snake(normalized)
     parts = [part for part in snake.split("_") if part]
     if parts:
@@ -207,16 +273,29 @@ def enum_member_upper_camel(text: str, fallback: str) -> str:
     return candidate
 
 
+@functools.cache
+def property_member_name(schema_property_name: str) -> tuple[str, bool]:
+    snake_name = camel_to_snake(schema_property_name)
+    return sanitize_identifier(snake_name, fallback="field")
+
+
 def build_name_map(definition_names: list[str]) -> dict[str, str]:
     out: dict[str, str] = {}
     used: set[str] = set()
+    # Next suffix worth probing per base; every lower suffix is already taken.
+    next_suffix: dict[str, int] = {}
     for original in sorted(definition_names):
         base = sanitize_type_identifier(original, fallback="Type")
         candidate = base
-        suffix = 2
-        while candidate in used:
+        if candidate in used:
+            suffix = next_suffix.get(base, 2)
             candidate = f"{base}_{suffix}"
-            suffix += 1
+            while candidate in used:
+                suffix += 1
+                candidate = f"{base}_{suffix}"
+            next_suffix[base] = suffix + 1
+        # Generated names are reused as dict keys and compared throughout emission.
+        candidate = sys.intern(candidate)
         out[original] = candidate
         used.add(candidate)
     return out
@@ -228,20 +307,19 @@ def split_documentation(documentation: str | None) -> list[str]:
     return [line.rstrip() for line in str(documentation).splitlines()]
 
 
-def documentation_mentions_tag(documentation: str | None, tag: str) -> bool:
+def documentation_tags(documentation: str | None) -> set[str]:
     if not documentation:
-        return False
-    return bool(
-        re.search(rf"\b@?{re.escape(tag)}\b", documentation, flags=re.IGNORECASE)
-    )
+        return set()
+    return {match.lastgroup for match in DOC_TAG_RE.finditer(documentation)}
 
 
 def build_doc_lines(doc: DocInfo) -> list[str]:
     lines = split_documentation(doc.documentation)
-    has_since = documentation_mentions_tag(doc.documentation, "since")
-    has_since_tags = documentation_mentions_tag(doc.documentation, "sinceTags")
-    has_deprecated = documentation_mentions_tag(doc.documentation, "deprecated")
-    has_proposed = documentation_mentions_tag(doc.documentation, "proposed")
+    mentioned = documentation_tags(doc.documentation)
+    has_since = "since" in mentioned
+    has_since_tags = "since_tags" in mentioned
+    has_deprecated = "deprecated" in mentioned
+    has_proposed = "proposed" in mentioned
 
     def append_tag_line(tag_line: str) -> None:
         for chunk in str(tag_line).splitlines():
@@ -261,14 +339,14 @@ def build_doc_lines(doc: DocInfo) -> list[str]:
     return lines
 
 
-def append_doc(out: list[str], indent: str, comments: list[str]) -> None:
+def write_doc(out: TextIO, indent: str, comments: Sequence[str]) -> None:
     if not comments:
         return
     for line in comments:
         if not line:
-            out.append(f"{indent}///")
+            out.write(f"{indent}///\n")
             continue
-        out.append(f"{indent}/// {line}")
+        out.write(f"{indent}/// {line}\n")
 
 
 def parse_doc(item: dict) -> DocInfo:
@@ -281,7 +359,50 @@ def parse_doc(item: dict) -> DocInfo:
     )
 
 
+def index_closed_string_enums(
+    enumerations: dict[str, EnumDef],
+) -> tuple[frozenset[str], dict[str, str]]:
+    closed_names = frozenset(
+        name
+        for name, enum_def in enumerations.items()
+        if enum_def.type_expr.get("name") == "string"
+        and not enum_def.supports_custom_values
+    )
+    # A literal maps to its owning enum only when exactly one closed enum uses it.
+    literal_owner: dict[str, str] = {}
+    ambiguous_literals: set[str] = set()
+    for enum_name in closed_names:
+        for value in enumerations[enum_name].values:
+            literal_text = str(value.value)
+            if literal_text in ambiguous_literals:
+                continue
+            owner = literal_owner.setdefault(literal_text, enum_name)
+            if owner != enum_name:
+                del literal_owner[literal_text]
+                ambiguous_literals.add(literal_text)
+    return closed_names, literal_owner
+
+
+def intern_type_strings(schema: dict) -> None:
+    # Strings from json.loads are not interned; interning the hot `kind` tags
+    # and base type names lets equality checks hit the identity fast path.
+    stack: list[object] = [schema]
+    while stack:
+        node = stack.pop()
+        if type(node) is dict:
+            kind = node.get("kind")
+            if type(kind) is str:
+                node["kind"] = kind = sys.intern(kind)
+                name = node.get("name")
+                if kind == "base" and type(name) is str:
+                    node["name"] = sys.intern(name)
+            stack.extend(node.values())
+        elif type(node) is list:
+            stack.extend(node)
+
+
 def parse_schema(schema: dict) -> SchemaModel:
+    intern_type_strings(schema)
     structures: dict[str, StructDef] = {}
     for item in schema.get("structures", []):
         properties: list[PropertyDef] = []
@@ -358,12 +479,20 @@ def parse_schema(schema: dict) -> SchemaModel:
             )
         )
 
+    closed_string_enum_names, closed_string_literal_owner = index_closed_string_enums(
+        enumerations
+    )
     return SchemaModel(
         structures=structures,
         enumerations=enumerations,
         aliases=aliases,
         requests=requests,
         notifications=notifications,
+        struct_names=frozenset(structures),
+        enum_names=frozenset(enumerations),
+        alias_names=frozenset(aliases),
+        closed_string_enum_names=closed_string_enum_names,
+        closed_string_literal_owner=closed_string_literal_owner,
     )
 
 
@@ -373,89 +502,125 @@ def fetch_schema(
     version: str,
 ) -> dict[str, object]:
     source = DEFAULT_FETCH_URL.format(version=version)
+    # `<schema>.etag` records the URL the copy came from and the server's cache
+    # validators, so a copy is only revalidated against the URL it came from.
+    validators_path = output.with_name(f"{output.name}.etag")
 
+    # Revalidate an existing copy instead of downloading it again unconditionally.
+    headers: dict[str, str] = {}
+    if output.exists() and validators_path.exists():
+        try:
+            stored = json.loads(validators_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            stored = None
+        if isinstance(stored, dict) and stored.get("source") == source:
+            if stored.get("etag"):
+                headers["If-None-Match"] = stored["etag"]
+            if stored.get("last_modified"):
+                headers["If-Modified-Since"] = stored["last_modified"]
+
+    request = urllib.request.Request(source, headers=headers)
+    not_modified = False
     try:
-        with urllib.request.urlopen(source, timeout=DEFAULT_FETCH_TIMEOUT) as response:
+        with urllib.request.urlopen(request, timeout=DEFAULT_FETCH_TIMEOUT) as response:
             payload = response.read()
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+    except urllib.error.HTTPError as exc:
+        if exc.code != 304 or not headers:
+            raise RuntimeError(f"download failed: {exc}") from exc
+        payload = output.read_bytes()
+        not_modified = True
     except urllib.error.URLError as exc:
         raise RuntimeError(f"download failed: {exc}") from exc
 
+    # Parse and persist the downloaded bytes directly instead of keeping a
+    # decoded copy of the (multi-megabyte) metaModel alive alongside them.
     try:
-        text = payload.decode("utf-8")
+        parsed = json.loads(payload)
     except UnicodeDecodeError as exc:
         raise RuntimeError(f"utf-8 decode failed: {exc}") from exc
-
-    try:
-        parsed = json.loads(text)
     except json.JSONDecodeError as exc:
         raise RuntimeError(f"invalid json: {exc}") from exc
 
-    output.parent.mkdir(parents=True, exist_ok=True)
-    output.write_text(text, encoding="utf-8")
+    if not not_modified:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_bytes(payload)
+        if etag or last_modified:
+            validators = {
+                "source": source,
+                "etag": etag,
+                "last_modified": last_modified,
+            }
+            validators_path.write_text(json.dumps(validators), encoding="utf-8")
+        elif validators_path.exists():
+            validators_path.unlink()
 
     return {
         "source": source,
         "bytes": len(payload),
         "output": output,
+        "not_modified": not_modified,
         "schema_version": parsed.get("metaData", {}).get("version"),
     }
 
 
 def topological_order(
-    nodes: list[tuple[str, str]],
-    deps: dict[tuple[str, str], set[tuple[str, str]]],
-) -> list[tuple[str, str]]:
-    reverse: dict[tuple[str, str], set[tuple[str, str]]] = {n: set() for n in nodes}
-    indegree: dict[tuple[str, str], int] = {n: 0 for n in nodes}
+    nodes: list[NodeKey],
+    deps: dict[NodeKey, set[NodeKey]],
+) -> list[NodeKey]:
+    # `nodes` arrives in canonical order; visiting it in that order fills every
+    # adjacency list already ordered, so the BFS needs no sorting at all.
+    reverse: dict[NodeKey, list[NodeKey]] = {n: [] for n in nodes}
+    indegree: dict[NodeKey, int] = {n: 0 for n in nodes}
+    queue: deque[NodeKey] = deque()
 
     for n in nodes:
         for dep in deps.get(n, set()):
             if dep not in indegree:
                 continue
-            reverse[dep].add(n)
+            reverse[dep].append(n)
             indegree[n] += 1
+        # Only this iteration touches indegree[n], so roots are final here.
+        if indegree[n] == 0:
+            queue.append(n)
 
-    queue = deque(sorted([n for n in nodes if indegree[n] == 0]))
-    ordered: list[tuple[str, str]] = []
+    ordered: list[NodeKey] = []
 
     while queue:
         node = queue.popleft()
         ordered.append(node)
-        for nxt in sorted(reverse[node]):
+        for nxt in reverse[node]:
             indegree[nxt] -= 1
             if indegree[nxt] == 0:
                 queue.append(nxt)
 
     if len(ordered) != len(nodes):
         existing = set(ordered)
-        for node in sorted(nodes):
+        for node in nodes:
             if node not in existing:
                 ordered.append(node)
     return ordered
 
 
+@functools.cache
 def smallest_unsigned_type(max_value: int) -> str:
-    if max_value <= 0xFF:
-        return "std::uint8_t"
-    if max_value <= 0xFFFF:
-        return "std::uint16_t"
-    if max_value <= 0xFFFFFFFF:
-        return "std::uint32_t"
-    return "std::uint64_t"
+    return _UNSIGNED_TYPES[bisect.bisect_left(_UNSIGNED_BOUNDS, max_value)]
 
 
+@functools.cache
 def smallest_signed_type(min_value: int, max_value: int) -> str:
-    if min_value >= -(1 << 7) and max_value <= (1 << 7) - 1:
-        return "std::int8_t"
-    if min_value >= -(1 << 15) and max_value <= (1 << 15) - 1:
-        return "std::int16_t"
-    if min_value >= -(1 << 31) and max_value <= (1 << 31) - 1:
-        return "std::int32_t"
+    for lower, upper, type_name in _SIGNED_RANGES:
+        if min_value >= lower and max_value <= upper:
+            return type_name
     return "std::int64_t"
 
 
 def method_to_type_name(method: str, suffix: str) -> str:
-    parts = [part for part in re.split(r"[^0-9A-Za-z]+", method) if part]
+    if method.isascii():
+        parts = method.translate(_METHOD_SEPARATOR_TABLE).split()
+    else:
+        parts = [part for part in _METHOD_SEPARATOR_RE.split(method) if part]
     if parts:
         base = "".join(part[:1].upper() + part[1:] for part in parts)
     else:
@@ -494,28 +659,33 @@ class TypeRenderer:
     def __init__(self, model: SchemaModel, name_map: dict[str, str]):
         self.model = model
         self.name_map = name_map
-        self.struct_names = set(model.structures.keys())
-        self.alias_names = set(model.aliases.keys())
-        self.closed_string_enum_names = {
-            name
-            for name, enum_def in model.enumerations.items()
-            if enum_def.type_expr.get("name") == "string"
-            and not enum_def.supports_custom_values
-        }
-        literal_owner_candidates: dict[str, set[str]] = {}
-        for enum_name in self.closed_string_enum_names:
-            enum_def = model.enumerations[enum_name]
-            for value in enum_def.values:
-                literal_text = str(value.value)
-                literal_owner_candidates.setdefault(literal_text, set()).add(enum_name)
-        self.closed_string_literal_owner = {
-            literal: next(iter(owners))
-            for literal, owners in literal_owner_candidates.items()
-            if len(owners) == 1
-        }
+        self.closed_string_enum_names = model.closed_string_enum_names
+        self.closed_string_literal_owner = model.closed_string_literal_owner
+        self._render_cache: dict[tuple[int, str | None], tuple[dict, str]] = {}
+
+    def cpp_name(self, schema_name: str) -> str:
+        # Only sanitize on a miss; a `.get` default would be evaluated every call.
+        cpp = self.name_map.get(schema_name)
+        if cpp is None:
+            cpp = sanitize_type_identifier(schema_name, fallback="Type")
+        return cpp
 
     def render_type(
         self, type_expr: dict, owner: str, current_struct: str | None = None
+    ) -> str:
+        # `owner` only labels errors, so it is not part of the key. Entries keep
+        # the expression alive so its id cannot be reused by another object.
+        key = (id(type_expr), current_struct)
+        cached = self._render_cache.get(key)
+        if cached is not None:
+            return cached[1]
+
+        rendered = self._render_type(type_expr, owner, current_struct)
+        self._render_cache[key] = (type_expr, rendered)
+        return rendered
+
+    def _render_type(
+        self, type_expr: dict, owner: str, current_struct: str | None
     ) -> str:
         kind = type_expr.get("kind")
 
@@ -525,18 +695,12 @@ class TypeRenderer:
         if kind == "reference":
             ref_name = type_expr["name"]
             if current_struct is not None and ref_name == current_struct:
-                cpp_name = self.name_map.get(
-                    ref_name, sanitize_type_identifier(ref_name, fallback="Type")
-                )
+                cpp_name = self.cpp_name(ref_name)
                 return f"std::shared_ptr<{cpp_name}>"
             if ref_name in self.closed_string_enum_names:
-                enum_cpp = self.name_map.get(
-                    ref_name, sanitize_type_identifier(ref_name, fallback="Type")
-                )
+                enum_cpp = self.cpp_name(ref_name)
                 return f"enum_string<{enum_cpp}>"
-            return self.name_map.get(
-                ref_name, sanitize_type_identifier(ref_name, fallback="Type")
-            )
+            return self.cpp_name(ref_name)
 
         if kind == "array":
             element = self.render_type(
@@ -591,9 +755,7 @@ class TypeRenderer:
             literal_value = str(type_expr.get("value", ""))
             owner_enum = self.closed_string_literal_owner.get(literal_value)
             if owner_enum:
-                enum_cpp = self.name_map.get(
-                    owner_enum, sanitize_type_identifier(owner_enum, fallback="Type")
-                )
+                enum_cpp = self.cpp_name(owner_enum)
                 return f"enum_string<{enum_cpp}>"
             return "string"
 
@@ -643,149 +805,208 @@ class TypeRenderer:
 
 
 class Generator:
-    def __init__(self, model: SchemaModel, name_map: dict[str, str]):
+    def __init__(
+        self,
+        model: SchemaModel,
+        name_map: dict[str, str],
+        field_placeholders: bool = True,
+    ):
         self.model = model
         self.name_map = name_map
+        self.field_placeholders = field_placeholders
         self.renderer = TypeRenderer(model, name_map)
 
-        self.struct_names = set(model.structures.keys())
-        self.enum_names = set(model.enumerations.keys())
-        self.alias_names = set(model.aliases.keys())
-
-        self.struct_dep_cache: dict[str, set[tuple[str, str]]] = {}
-        self.flattened_property_cache: dict[str, list[FlattenedProperty]] = {}
+        self.struct_names = model.struct_names
+        self.enum_names = model.enum_names
+        self.alias_names = model.alias_names
+
+        self.struct_dep_cache: dict[str, frozenset[NodeKey]] = {}
+        self.flattened_property_cache: dict[str, tuple[FlattenedProperty, ...]] = {}
+        self.inherited_member_cache: dict[
+            str, tuple[tuple[FlattenedProperty, str], ...]
+        ] = {}
+        self._doc_lines_cache: dict[int, tuple[DocInfo, tuple[str, ...]]] = {}
+        self.single_struct_parent: dict[str, str | None] = {
+            name: (
+                struct_def.parents[0]
+                if len(struct_def.parents) == 1
+                and struct_def.parents[0] in self.struct_names
+                else None
+            )
+            for name, struct_def in model.structures.items()
+        }
 
-        self.keyword_hits: list[str] = []
-        self.bool_default_warnings: list[str] = []
-        self.member_collision_warnings: list[str] = []
-        self.unsafe_override_warnings: list[str] = []
-        self.closed_string_enum_literal_members: dict[str, dict[str, str]] = {}
+        # Diagnostics are logged as they are found; only per-category counts
+        # are kept for the summary.
+        self.keyword_hit_count = 0
+        self.bool_warning_count = 0
+        self.unsafe_override_count = 0
+        self.member_collision_count = 0
+        self.closed_string_enum_literal_members: dict[tuple[str, str], str] = {}
+        literal_members = self.closed_string_enum_literal_members
         for enum_name in self.renderer.closed_string_enum_names:
             enum_def = model.enumerations[enum_name]
-            used_member_names: Counter[str] = Counter()
-            value_to_member: dict[str, str] = {}
+            used_member_names: dict[str, int] = {}
             for index, value in enumerate(enum_def.values):
                 base_member_name = enum_member_upper_camel(
                     str(value.value), fallback=f"Value{index + 1}"
                 )
-                dedupe_index = used_member_names[base_member_name]
-                used_member_names[base_member_name] += 1
+                dedupe_index = used_member_names.get(base_member_name, 0)
+                used_member_names[base_member_name] = dedupe_index + 1
                 member_name = (
                     base_member_name
                     if dedupe_index == 0
                     else f"{base_member_name}{dedupe_index + 1}"
                 )
-                value_to_member[str(value.value)] = member_name
-            self.closed_string_enum_literal_members[enum_name] = value_to_member
+                literal_members[(enum_name, str(value.value))] = member_name
+
+    def doc_lines(self, doc: DocInfo) -> tuple[str, ...]:
+        # Inherited members re-render the same docs for every descendant. Docs
+        # are immutable for the run, and each entry keeps its key object alive.
+        cached = self._doc_lines_cache.get(id(doc))
+        if cached is not None:
+            return cached[1]
+
+        lines = tuple(build_doc_lines(doc))
+        self._doc_lines_cache[id(doc)] = (doc, lines)
+        return lines
 
     def _walk_type_refs(
-        self, type_expr: dict, current_struct: str, out: set[tuple[str, str]]
+        self, type_expr: dict, current_struct: str, out: set[NodeKey]
     ) -> None:
-        if not isinstance(type_expr, dict):
-            return
-        kind = type_expr.get("kind")
-        if kind == "reference":
-            ref = type_expr.get("name")
-            if ref == current_struct:
-                return
-            if ref in self.struct_names:
-                out.add(("S", ref))
-            elif ref in self.enum_names:
-                out.add(("E", ref))
-            elif ref in self.alias_names and ref not in RECURSIVE_ALIASES:
-                out.add(("A", ref))
-            return
+        stack = [type_expr]
+        while stack:
+            type_expr = stack.pop()
+            if type(type_expr) is not dict:
+                continue
+            kind = type_expr.get("kind")
+            if kind == "reference":
+                ref = type_expr.get("name")
+                if ref == current_struct:
+                    continue
+                if ref in self.struct_names:
+                    out.add((NodeKind.STRUCT, ref))
+                elif ref in self.enum_names:
+                    out.add((NodeKind.ENUM, ref))
+                elif ref in self.alias_names and ref not in RECURSIVE_ALIASES:
+                    out.add((NodeKind.ALIAS, ref))
+                continue
 
-        if kind == "stringLiteral":
-            literal_text = str(type_expr.get("value", ""))
-            owner_enum = self.renderer.closed_string_literal_owner.get(literal_text)
-            if owner_enum in self.enum_names:
-                out.add(("E", owner_enum))
-            return
+            if kind == "stringLiteral":
+                literal_text = str(type_expr.get("value", ""))
+                owner_enum = self.renderer.closed_string_literal_owner.get(literal_text)
+                if owner_enum in self.enum_names:
+                    out.add((NodeKind.ENUM, owner_enum))
+                continue
 
-        if kind == "array":
-            self._walk_type_refs(type_expr.get("element"), current_struct, out)
-        elif kind == "map":
-            self._walk_type_refs(type_expr.get("key"), current_struct, out)
-            self._walk_type_refs(type_expr.get("value"), current_struct, out)
-        elif kind in {"or", "and", "tuple"}:
-            for item in type_expr.get("items", []):
-                self._walk_type_refs(item, current_struct, out)
-        elif kind == "literal":
-            for prop in type_expr.get("value", {}).get("properties", []):
-                self._walk_type_refs(prop.get("type"), current_struct, out)
+            if kind == "array":
+                stack.append(type_expr.get("element"))
+            elif kind == "map":
+                stack.append(type_expr.get("key"))
+                stack.append(type_expr.get("value"))
+            elif kind in {"or", "and", "tuple"}:
+                stack.extend(type_expr.get("items", []))
+            elif kind == "literal":
+                for prop in type_expr.get("value", {}).get("properties", []):
+                    stack.append(prop.get("type"))
 
     def collect_flattened_properties(
-        self,
-        struct_name: str,
-        stack: set[str] | None = None,
-    ) -> list[FlattenedProperty]:
+        self, struct_name: str
+    ) -> tuple[FlattenedProperty, ...]:
+        # The cached tuple is shared between callers and must not be mutated.
         cached = self.flattened_property_cache.get(struct_name)
         if cached is not None:
-            return list(cached)
-
-        if stack is None:
-            stack = set()
-        if struct_name in stack:
-            return []
-        stack.add(struct_name)
-
-        struct_def = self.model.structures[struct_name]
-        out: list[FlattenedProperty] = []
-
-        if len(struct_def.parents) == 1 and struct_def.parents[0] in self.struct_names:
-            out.extend(self.collect_flattened_properties(struct_def.parents[0], stack))
-
-        for prop in struct_def.properties:
-            out.append(FlattenedProperty(prop=prop, declared_in=struct_name))
+            return cached
+
+        # Walk up the single-inheritance chain until a cached ancestor, a root,
+        # or a cycle; a cyclic parent contributes nothing, as in a recursive walk.
+        # Ancestors are pushed to the left so the chain ends up root-first.
+        chain: deque[str] = deque([struct_name])
+        visited = {struct_name}
+        inherited: tuple[FlattenedProperty, ...] = ()
+        parent = self.single_struct_parent[struct_name]
+        while parent is not None:
+            cached = self.flattened_property_cache.get(parent)
+            if cached is not None:
+                inherited = cached
+                break
+            if parent in visited:
+                break
+            chain.appendleft(parent)
+            visited.add(parent)
+            parent = self.single_struct_parent[parent]
+
+        for name in chain:
+            inherited = inherited + tuple(
+                FlattenedProperty(prop=prop, declared_in=name)
+                for prop in self.model.structures[name].properties
+            )
+            self.flattened_property_cache[name] = inherited
+        return inherited
+
+    def inherited_members(
+        self, parent_name: str
+    ) -> tuple[tuple[FlattenedProperty, str], ...]:
+        # Every child of the same parent needs the flattened properties paired
+        # with their member names; resolve the names once per parent.
+        cached = self.inherited_member_cache.get(parent_name)
+        if cached is not None:
+            return cached
 
-        stack.remove(struct_name)
-        self.flattened_property_cache[struct_name] = list(out)
-        return list(out)
+        inherited = tuple(
+            (flat, property_member_name(flat.prop.name)[0])
+            for flat in self.collect_flattened_properties(parent_name)
+        )
+        self.inherited_member_cache[parent_name] = inherited
+        return inherited
 
-    def struct_dependencies(self, struct_name: str) -> set[tuple[str, str]]:
+    def struct_dependencies(self, struct_name: str) -> frozenset[NodeKey]:
         cached = self.struct_dep_cache.get(struct_name)
         if cached is not None:
-            return set(cached)
+            return cached
 
         struct_def = self.model.structures[struct_name]
-        deps: set[tuple[str, str]] = set()
+        deps: set[NodeKey] = set()
         if len(struct_def.parents) > 1:
             for parent in struct_def.parents:
                 if parent in self.struct_names:
-                    deps.add(("S", parent))
+                    deps.add((NodeKind.STRUCT, parent))
 
         for flat in self.collect_flattened_properties(struct_name):
             self._walk_type_refs(
                 flat.prop.type_expr, current_struct=flat.declared_in, out=deps
             )
 
-        deps.discard(("S", struct_name))
-        self.struct_dep_cache[struct_name] = set(deps)
-        return deps
+        deps.discard((NodeKind.STRUCT, struct_name))
+        frozen = frozenset(deps)
+        self.struct_dep_cache[struct_name] = frozen
+        return frozen
 
     def build_node_dependencies(
         self,
-    ) -> tuple[list[tuple[str, str]], dict[tuple[str, str], set[tuple[str, str]]]]:
-        nodes: list[tuple[str, str]] = []
-        nodes.extend(("S", name) for name in self.struct_names)
-        nodes.extend(("E", name) for name in self.enum_names)
+    ) -> tuple[list[NodeKey], dict[NodeKey, set[NodeKey]]]:
+        # Canonical node order: grouped by kind, then by schema name.
+        nodes: list[NodeKey] = []
         nodes.extend(
-            ("A", name) for name in self.alias_names if name not in RECURSIVE_ALIASES
+            (NodeKind.ALIAS, name)
+            for name in sorted(self.alias_names)
+            if name not in RECURSIVE_ALIASES
         )
+        nodes.extend((NodeKind.ENUM, name) for name in sorted(self.enum_names))
+        nodes.extend((NodeKind.STRUCT, name) for name in sorted(self.struct_names))
         node_set = set(nodes)
 
-        deps: dict[tuple[str, str], set[tuple[str, str]]] = {n: set() for n in nodes}
+        deps: dict[NodeKey, set[NodeKey]] = {n: set() for n in nodes}
 
         for struct_name in self.struct_names:
-            node = ("S", struct_name)
-            deps[node].update(self.struct_dependencies(struct_name))
+            node = (NodeKind.STRUCT, struct_name)
+            deps[node] |= self.struct_dependencies(struct_name)
 
         for alias_name, alias_def in self.model.aliases.items():
             if alias_name in RECURSIVE_ALIASES:
                 continue
-            node = ("A", alias_name)
-            alias_deps: set[tuple[str, str]] = set()
+            node = (NodeKind.ALIAS, alias_name)
+            alias_deps: set[NodeKey] = set()
             self._walk_type_refs(
                 alias_def.type_expr, current_struct=alias_name, out=alias_deps
             )
@@ -795,28 +1016,17 @@ class Generator:
         for node, node_deps in list(deps.items()):
             deps[node] = {dep for dep in node_deps if dep in node_set}
 
-        return sorted(nodes), deps
+        return nodes, deps
 
-    def build_node_order(self) -> list[tuple[str, str]]:
+    def build_node_order(self) -> list[NodeKey]:
         nodes, deps = self.build_node_dependencies()
         return topological_order(nodes, deps)
 
-    def is_optional_bool(self, prop: PropertyDef) -> bool:
-        return bool(
-            prop.optional
-            and prop.type_expr.get("kind") == "base"
-            and prop.type_expr.get("name") == "boolean"
-        )
-
     def bool_default_needs_warning(self, prop: PropertyDef) -> bool:
         doc = prop.doc.documentation or ""
         if not doc.strip():
             return False
-        return any(pattern.search(doc) for pattern in SUSPICIOUS_BOOL_PATTERNS)
-
-    def property_member_name(self, schema_property_name: str) -> tuple[str, bool]:
-        snake_name = camel_to_snake(schema_property_name)
-        return sanitize_identifier(snake_name, fallback="field")
+        return SUSPICIOUS_BOOL_RE.search(doc) is not None
 
     def is_type_subtype(self, child: dict, parent: dict) -> bool:
         if child == parent:
@@ -918,57 +1128,69 @@ class Generator:
         inherited_from: str | None,
     ) -> MemberDef:
         prop = flat_prop.prop
+        type_expr = prop.type_expr
+        renderer = self.renderer
         owner_cpp = self.name_map[owner_struct]
         owner_path = f"{owner_cpp}.{prop.name}"
+        kind = type_expr.get("kind")
 
-        rendered_type = self.renderer.render_type(
-            prop.type_expr,
-            owner=owner_path,
-            current_struct=flat_prop.declared_in,
-        )
-
+        # Optional booleans never need the rendered `bool`, and a base type
+        # cannot fail to render, so that case skips the renderer entirely.
         default_value: str | None = None
-        if self.is_optional_bool(prop):
+        if prop.optional and kind == "base" and type_expr.get("name") == "boolean":
             rendered_type = "optional_bool"
             default_value = "{}"
             if self.bool_default_needs_warning(prop):
-                self.bool_default_warnings.append(
-                    f"{owner_struct}.{prop.name}: optional bool defaults to false but docs suggest default true."
+                self.bool_warning_count += 1
+                logger.warning(
+                    "%s.%s: optional bool defaults to false but docs suggest default true.",
+                    owner_struct,
+                    prop.name,
                 )
-        elif prop.optional:
-            if rendered_type.startswith("variant<") and rendered_type.endswith(">"):
-                variant_args = rendered_type[len("variant<") : -1]
-                rendered_type = f"optional_variant<{variant_args}>"
-            else:
-                rendered_type = f"optional<{rendered_type}>"
-            default_value = "{}"
-        elif prop.type_expr.get("kind") == "stringLiteral":
-            literal_text = str(prop.type_expr.get("value", ""))
-            owner_enum = self.renderer.closed_string_literal_owner.get(literal_text)
-            if owner_enum:
-                member_name = self.closed_string_enum_literal_members.get(
-                    owner_enum, {}
-                ).get(literal_text)
-                if member_name:
-                    enum_cpp = self.name_map.get(
-                        owner_enum,
-                        sanitize_type_identifier(owner_enum, fallback="Type"),
+        else:
+            rendered_type = renderer.render_type(
+                type_expr,
+                owner=owner_path,
+                current_struct=flat_prop.declared_in,
+            )
+            if prop.optional:
+                if rendered_type.startswith("variant<") and rendered_type.endswith(">"):
+                    variant_args = rendered_type[len("variant<") : -1]
+                    rendered_type = f"optional_variant<{variant_args}>"
+                else:
+                    rendered_type = f"optional<{rendered_type}>"
+                default_value = "{}"
+            elif kind == "stringLiteral":
+                literal_text = str(type_expr.get("value", ""))
+                owner_enum = renderer.closed_string_literal_owner.get(literal_text)
+                if owner_enum:
+                    member_name = self.closed_string_enum_literal_members.get(
+                        (owner_enum, literal_text)
                     )
-                    default_value = f"{enum_cpp}::{member_name}"
+                    if member_name:
+                        enum_cpp = renderer.cpp_name(owner_enum)
+                        default_value = f"{enum_cpp}::{member_name}"
 
-        member_name, keyword_hit = self.property_member_name(prop.name)
+        member_name, keyword_hit = property_member_name(prop.name)
         if keyword_hit:
-            self.keyword_hits.append(
-                f"{owner_struct}.{prop.name}: renamed to `{member_name}` due to C++ keyword collision."
+            self.keyword_hit_count += 1
+            logger.info(
+                "%s.%s: renamed to `%s` due to C++ keyword collision.",
+                owner_struct,
+                prop.name,
+                member_name,
             )
 
-        comments = build_doc_lines(prop.doc)
-        if not comments:
+        comments = list(self.doc_lines(prop.doc))
+        if not comments and self.field_placeholders:
             comments = [f"Schema field: {prop.name}."]
 
         if inherited_from is not None:
             suffix = f"(Inherited from [{inherited_from}])"
-            comments[-1] = f"{comments[-1]} {suffix}" if comments else suffix
+            if comments:
+                comments[-1] = f"{comments[-1]} {suffix}"
+            else:
+                comments.append(suffix)
 
         return MemberDef(
             cxx_type=rendered_type,
@@ -978,15 +1200,17 @@ class Generator:
         )
 
     def make_flatten_member(self, owner_struct: str, parent_name: str) -> MemberDef:
-        parent_cpp = self.name_map.get(
-            parent_name, sanitize_type_identifier(parent_name, fallback="Type")
-        )
+        parent_cpp = self.renderer.cpp_name(parent_name)
         parent_field_name, keyword_hit = sanitize_identifier(
             camel_to_snake(parent_cpp), fallback="base"
         )
         if keyword_hit:
-            self.keyword_hits.append(
-                f"{owner_struct}.{parent_name}: renamed flatten field to `{parent_field_name}` due to C++ keyword collision."
+            self.keyword_hit_count += 1
+            logger.info(
+                "%s.%s: renamed flatten field to `%s` due to C++ keyword collision.",
+                owner_struct,
+                parent_name,
+                parent_field_name,
             )
 
         return MemberDef(
@@ -999,16 +1223,17 @@ class Generator:
     def collect_struct_members(self, struct_name: str) -> list[MemberDef]:
         struct_def = self.model.structures[struct_name]
         members: list[MemberDef] = []
+        make_member = self.make_member
+        struct_names = self.struct_names
 
-        if len(struct_def.parents) == 1 and struct_def.parents[0] in self.struct_names:
-            parent = struct_def.parents[0]
+        parent = self.single_struct_parent[struct_name]
+        if parent is not None:
             local_props_by_member_name: dict[str, PropertyDef] = {}
             for prop in struct_def.properties:
-                member_name = self.property_member_name(prop.name)[0]
+                member_name = property_member_name(prop.name)[0]
                 local_props_by_member_name[member_name] = prop
 
-            for flat in self.collect_flattened_properties(parent):
-                inherited_name = self.property_member_name(flat.prop.name)[0]
+            for flat, inherited_name in self.inherited_members(parent):
                 local_prop = local_props_by_member_name.get(inherited_name)
                 if local_prop is not None:
                     safe, reason = self.is_safe_override(flat.prop, local_prop)
@@ -1016,22 +1241,26 @@ class Generator:
                     if safe:
                         continue
 
-                    self.unsafe_override_warnings.append(
-                        f"{struct_name}.{inherited_name}: inherited `{flat.prop.name}` from "
-                        f"`{flat.declared_in}` conflicts with local `{local_prop.name}`; {reason}."
+                    self.unsafe_override_count += 1
+                    logger.warning(
+                        "%s.%s: inherited `%s` from `%s` conflicts with local `%s`; %s.",
+                        struct_name,
+                        inherited_name,
+                        flat.prop.name,
+                        flat.declared_in,
+                        local_prop.name,
+                        reason,
                     )
-                members.append(
-                    self.make_member(struct_name, flat, inherited_from=parent)
-                )
+                members.append(make_member(struct_name, flat, inherited_from=parent))
         elif len(struct_def.parents) > 1:
             for parent in struct_def.parents:
-                if parent not in self.struct_names:
+                if parent not in struct_names:
                     continue
                 members.append(self.make_flatten_member(struct_name, parent))
 
         for prop in struct_def.properties:
             members.append(
-                self.make_member(
+                make_member(
                     struct_name,
                     FlattenedProperty(prop=prop, declared_in=struct_name),
                     inherited_from=None,
@@ -1039,79 +1268,77 @@ class Generator:
             )
         return members
 
-    def unique_member_name(
-        self, struct_name: str, base_name: str, used_names: Counter[str]
-    ) -> str:
-        index = used_names[base_name]
-        used_names[base_name] += 1
-        if index == 0:
-            return base_name
-        renamed = f"{base_name}_{index + 1}"
-        self.member_collision_warnings.append(
-            f"{struct_name}.{base_name}: duplicate member name, renamed to `{renamed}`."
-        )
-        return renamed
+    def emit_node(self, node: NodeKey, out: TextIO) -> None:
+        kind, name = node
+        if kind == NodeKind.ALIAS:
+            self.emit_alias(name, out)
+        elif kind == NodeKind.STRUCT:
+            self.emit_struct(name, out)
+        else:
+            self.emit_enum(name, out)
 
-    def emit_alias(self, alias_name: str) -> str:
+    def emit_alias(self, alias_name: str, out: TextIO) -> None:
         alias = self.model.aliases[alias_name]
         alias_cpp = self.name_map[alias_name]
         alias_type = self.renderer.render_type(
             alias.type_expr, owner=f"alias[{alias_name}]"
         )
 
-        lines: list[str] = []
-        append_doc(
-            lines,
-            indent="",
-            comments=build_doc_lines(alias.doc),
-        )
-        lines.append(f"using {alias_cpp} = {alias_type};")
-        return "\n".join(lines)
+        write_doc(out, indent="", comments=self.doc_lines(alias.doc))
+        out.write(f"using {alias_cpp} = {alias_type};\n")
 
-    def emit_struct(self, struct_name: str) -> str:
+    def emit_struct(self, struct_name: str, out: TextIO) -> None:
         struct_def = self.model.structures[struct_name]
         struct_cpp = self.name_map[struct_name]
 
-        lines: list[str] = []
-        append_doc(
-            lines,
-            indent="",
-            comments=build_doc_lines(struct_def.doc),
-        )
-        lines.append(f"struct {struct_cpp} {{")
+        write_doc(out, indent="", comments=self.doc_lines(struct_def.doc))
+        out.write(f"struct {struct_cpp} {{\n")
 
         members = self.collect_struct_members(struct_name)
-        used_names: Counter[str] = Counter()
+        used_names: dict[str, int] = {}
         if not members:
-            lines.append("    // empty")
+            out.write("    // empty\n")
 
         for index, member in enumerate(members):
-            append_doc(lines, indent="    ", comments=member.comments)
-            member_name = self.unique_member_name(
-                struct_name, member.base_name, used_names
-            )
-            decl = f"    {member.cxx_type} {member_name}"
-            if member.default_value is not None:
-                decl += f" = {member.default_value}"
-            decl += ";"
-            lines.append(decl)
+            write_doc(out, indent="    ", comments=member.comments)
+            base_name = member.base_name
+            dedupe_index = used_names.get(base_name, 0)
+            used_names[base_name] = dedupe_index + 1
+            if dedupe_index == 0:
+                member_name = base_name
+            else:
+                member_name = f"{base_name}_{dedupe_index + 1}"
+                self.member_collision_count += 1
+                logger.warning(
+                    "%s.%s: duplicate member name, renamed to `%s`.",
+                    struct_name,
+                    base_name,
+                    member_name,
+                )
+            default_value = member.default_value
+            if default_value is None:
+                out.write(f"    {member.cxx_type} {member_name};\n")
+            else:
+                out.write(f"    {member.cxx_type} {member_name} = {default_value};\n")
             if index + 1 < len(members):
-                lines.append("")
+                out.write("\n")
 
-        lines.append("};")
-        return "\n".join(lines)
+        out.write("};\n")
 
-    def emit_enum(self, enum_name: str) -> str:
+    def emit_enum(self, enum_name: str, out: TextIO) -> None:
         enum_def = self.model.enumerations[enum_name]
         enum_cpp = self.name_map[enum_name]
         base_name = enum_def.type_expr.get("name")
 
-        lines: list[str] = []
-        comments = build_doc_lines(enum_def.doc)
-        comments.append(
-            f"supportsCustomValues: {str(enum_def.supports_custom_values).lower()}"
-        )
-        append_doc(lines, indent="", comments=comments)
+        comments = [
+            *self.doc_lines(enum_def.doc),
+            f"supportsCustomValues: {str(enum_def.supports_custom_values).lower()}",
+        ]
+        write_doc(out, indent="", comments=comments)
+        value_comments_list = [self.doc_lines(value.doc) for value in enum_def.values]
+        value_has_docs = [
+            bool(value_comments) for value_comments in value_comments_list
+        ]
 
         if base_name in {"integer", "uinteger"}:
             underlying = base_name
@@ -1122,107 +1349,92 @@ class Generator:
                         underlying = smallest_signed_type(min(values), max(values))
                     else:
                         underlying = smallest_unsigned_type(max(values))
-            lines.append(f"enum class {enum_cpp} : {underlying} {{")
-            used_member_names: Counter[str] = Counter()
-            value_comments_list = [
-                build_doc_lines(value.doc) for value in enum_def.values
-            ]
+            out.write(f"enum class {enum_cpp} : {underlying} {{\n")
+            used_member_names: dict[str, int] = {}
             for index, value in enumerate(enum_def.values):
-                value_comments = value_comments_list[index]
-                append_doc(lines, indent="    ", comments=value_comments)
+                write_doc(out, indent="    ", comments=value_comments_list[index])
                 base_member_name = enum_member_upper_camel(
                     str(value.name), fallback=f"Value{index + 1}"
                 )
-                dedupe_index = used_member_names[base_member_name]
-                used_member_names[base_member_name] += 1
+                dedupe_index = used_member_names.get(base_member_name, 0)
+                used_member_names[base_member_name] = dedupe_index + 1
                 member_name = (
                     base_member_name
                     if dedupe_index == 0
                     else f"{base_member_name}{dedupe_index + 1}"
                 )
                 comma = "," if index + 1 < len(enum_def.values) else ""
-                lines.append(f"    {member_name} = {value.value}{comma}")
+                out.write(f"    {member_name} = {value.value}{comma}\n")
                 if index + 1 < len(enum_def.values) and (
-                    value_comments or value_comments_list[index + 1]
+                    value_has_docs[index] or value_has_docs[index + 1]
                 ):
-                    lines.append("")
-            lines.append("};")
-            return "\n".join(lines)
+                    out.write("\n")
+            out.write("};\n")
+            return
 
         if base_name == "string":
             if enum_def.supports_custom_values:
-                lines.append(f"struct {enum_cpp} : std::string {{")
-                lines.append("    using std::string::string;")
-                lines.append("    using std::string::operator=;")
+                out.write(f"struct {enum_cpp} : std::string {{\n")
+                out.write("    using std::string::string;\n")
+                out.write("    using std::string::operator=;\n")
 
                 if enum_def.values:
-                    lines.append("")
+                    out.write("\n")
 
-                value_comments_list = [
-                    build_doc_lines(value.doc) for value in enum_def.values
-                ]
                 for index, value in enumerate(enum_def.values):
-                    value_comments = value_comments_list[index]
-                    append_doc(lines, indent="    ", comments=value_comments)
+                    write_doc(out, indent="    ", comments=value_comments_list[index])
                     member_name, _ = sanitize_identifier(
                         camel_to_snake(value.name), fallback=f"value_{index}"
                     )
                     escaped = json.dumps(str(value.value))
-                    lines.append(
-                        f"    constexpr inline static std::string_view {member_name} = {escaped};"
+                    out.write(
+                        f"    constexpr inline static std::string_view {member_name} = {escaped};\n"
                     )
                     if index + 1 < len(enum_def.values) and (
-                        value_comments or value_comments_list[index + 1]
+                        value_has_docs[index] or value_has_docs[index + 1]
                     ):
-                        lines.append("")
+                        out.write("\n")
 
-                lines.append("};")
-                return "\n".join(lines)
+                out.write("};\n")
+                return
 
             max_value = max(len(enum_def.values) - 1, 0)
             underlying = smallest_unsigned_type(max_value)
-            lines.append(f"enum class {enum_cpp} : {underlying} {{")
-            used_member_names: Counter[str] = Counter()
+            out.write(f"enum class {enum_cpp} : {underlying} {{\n")
+            used_member_names: dict[str, int] = {}
 
-            value_comments_list = [
-                build_doc_lines(value.doc) for value in enum_def.values
-            ]
             for index, value in enumerate(enum_def.values):
-                value_comments = value_comments_list[index]
-                append_doc(lines, indent="    ", comments=value_comments)
+                write_doc(out, indent="    ", comments=value_comments_list[index])
 
                 base_member_name = enum_member_upper_camel(
                     str(value.value), fallback=f"Value{index + 1}"
                 )
-                dedupe_index = used_member_names[base_member_name]
-                used_member_names[base_member_name] += 1
+                dedupe_index = used_member_names.get(base_member_name, 0)
+                used_member_names[base_member_name] = dedupe_index + 1
                 member_name = (
                     base_member_name
                     if dedupe_index == 0
                     else f"{base_member_name}{dedupe_index + 1}"
                 )
                 comma = "," if index + 1 < len(enum_def.values) else ""
-                lines.append(f"    {member_name}{comma}")
+                out.write(f"    {member_name}{comma}\n")
                 if index + 1 < len(enum_def.values) and (
-                    value_comments or value_comments_list[index + 1]
+                    value_has_docs[index] or value_has_docs[index + 1]
                 ):
-                    lines.append("")
+                    out.write("\n")
 
-            lines.append("};")
-            return "\n".join(lines)
+            out.write("};\n")
+            return
 
-        lines.append(f"// Unsupported enum base type: {base_name}")
-        return "\n".join(lines)
+        out.write(f"// Unsupported enum base type: {base_name}\n")
 
 
 def emit_extra_param_structs(
-    extra_params: list[ExtraParamDef], name_map: dict[str, str]
-) -> list[str]:
-    blocks: list[str] = []
+    extra_params: list[ExtraParamDef], name_map: dict[str, str], out: TextIO
+) -> None:
     for extra in sorted(extra_params, key=lambda item: item.method):
         params_cpp = name_map[extra.name]
-        blocks.append(f"struct {params_cpp} {{ }};")
-    return blocks
+        out.write(f"\nstruct {params_cpp} {{ }};\n")
 
 
 def render_method_params(
@@ -1272,9 +1484,9 @@ def build_trait_entries(
 
 
 def emit_xmacro(
-    name: str, entries: list[tuple[str, str] | tuple[str, str, str]]
-) -> list[str]:
-    lines: list[str] = [f"#define {name}(X) \\"]
+    name: str, entries: list[tuple[str, str] | tuple[str, str, str]], out: TextIO
+) -> None:
+    out.write(f"#define {name}(X) \\\n")
     for index, entry in enumerate(entries):
         if len(entry) == 2:
             params_cpp, method = entry
@@ -1283,8 +1495,34 @@ def emit_xmacro(
             params_cpp, result_cpp, method = entry
             payload = f"X(({params_cpp}), ({result_cpp}), {method})"
         suffix = " \\" if index + 1 < len(entries) else ""
-        lines.append(f"    {payload}{suffix}")
-    return lines
+        out.write(f"    {payload}{suffix}\n")
+
+
+TRAITS_DECLARATIONS = """
+#define LSP_TRAITS_TYPE(...) __VA_ARGS__
+
+#define LSP_REQUEST_TRAITS_DECLARE(PARAMS, RESULT, METHOD) \\
+template <> \\
+struct RequestTraits<LSP_TRAITS_TYPE PARAMS> { \\
+    using Result = LSP_TRAITS_TYPE RESULT; \\
+    constexpr inline static std::string_view method = METHOD; \\
+};
+
+LSP_REQUEST_TRAITS_XMACRO(LSP_REQUEST_TRAITS_DECLARE)
+
+#undef LSP_REQUEST_TRAITS_DECLARE
+
+#define LSP_NOTIFICATION_TRAITS_DECLARE(PARAMS, METHOD) \\
+template <> \\
+struct NotificationTraits<LSP_TRAITS_TYPE PARAMS> { \\
+    constexpr inline static std::string_view method = METHOD; \\
+};
+
+LSP_NOTIFICATION_TRAITS_XMACRO(LSP_NOTIFICATION_TRAITS_DECLARE)
+
+#undef LSP_NOTIFICATION_TRAITS_DECLARE
+#undef LSP_TRAITS_TYPE
+"""
 
 
 def emit_method_traits(
@@ -1293,7 +1531,8 @@ def emit_method_traits(
     notifications: list[NotificationDef],
     extra_params: list[ExtraParamDef],
     name_map: dict[str, str],
-) -> str:
+    out: TextIO,
+) -> None:
     extra_params_by_method = {extra.method: extra for extra in extra_params}
 
     def request_result(req: RequestDef) -> str:
@@ -1303,67 +1542,36 @@ def emit_method_traits(
             )
         return "null"
 
-    lines: list[str] = []
-    lines.extend(
-        emit_xmacro(
-            "LSP_REQUEST_TRAITS_XMACRO",
-            build_trait_entries(
-                requests,
-                result_for=request_result,
-                renderer=generator.renderer,
-                name_map=name_map,
-                extra_params_by_method=extra_params_by_method,
-            ),
-        )
+    emit_xmacro(
+        "LSP_REQUEST_TRAITS_XMACRO",
+        build_trait_entries(
+            requests,
+            result_for=request_result,
+            renderer=generator.renderer,
+            name_map=name_map,
+            extra_params_by_method=extra_params_by_method,
+        ),
+        out,
     )
-    lines.append("")
-    lines.extend(
-        emit_xmacro(
-            "LSP_NOTIFICATION_TRAITS_XMACRO",
-            build_trait_entries(
-                notifications,
-                result_for=lambda _: None,
-                renderer=generator.renderer,
-                name_map=name_map,
-                extra_params_by_method=extra_params_by_method,
-            ),
-        )
+    out.write("\n")
+    emit_xmacro(
+        "LSP_NOTIFICATION_TRAITS_XMACRO",
+        build_trait_entries(
+            notifications,
+            result_for=lambda _: None,
+            renderer=generator.renderer,
+            name_map=name_map,
+            extra_params_by_method=extra_params_by_method,
+        ),
+        out,
     )
-
-    lines.extend(
-        [
-            "",
-            "#define LSP_TRAITS_TYPE(...) __VA_ARGS__",
-            "",
-            "#define LSP_REQUEST_TRAITS_DECLARE(PARAMS, RESULT, METHOD) \\",
-            "template <> \\",
-            "struct RequestTraits<LSP_TRAITS_TYPE PARAMS> { \\",
-            "    using Result = LSP_TRAITS_TYPE RESULT; \\",
-            "    constexpr inline static std::string_view method = METHOD; \\",
-            "};",
-            "",
-            "LSP_REQUEST_TRAITS_XMACRO(LSP_REQUEST_TRAITS_DECLARE)",
-            "",
-            "#undef LSP_REQUEST_TRAITS_DECLARE",
-            "",
-            "#define LSP_NOTIFICATION_TRAITS_DECLARE(PARAMS, METHOD) \\",
-            "template <> \\",
-            "struct NotificationTraits<LSP_TRAITS_TYPE PARAMS> { \\",
-            "    constexpr inline static std::string_view method = METHOD; \\",
-            "};",
-            "",
-            "LSP_NOTIFICATION_TRAITS_XMACRO(LSP_NOTIFICATION_TRAITS_DECLARE)",
-            "",
-            "#undef LSP_NOTIFICATION_TRAITS_DECLARE",
-            "#undef LSP_TRAITS_TYPE",
-        ]
-    )
-
-    return "\n".join(lines)
+    out.write(TRAITS_DECLARATIONS)
 
 
 def generate_protocol_header(
-    schema_path: pathlib.Path, output_file: pathlib.Path
+    schema_path: pathlib.Path,
+    output_file: pathlib.Path,
+    field_placeholders: bool = True,
 ) -> dict[str, object]:
     schema = json.loads(schema_path.read_text(encoding="utf-8"))
     model = parse_schema(schema)
@@ -1377,60 +1585,53 @@ def generate_protocol_header(
     ]
     name_map = build_name_map(definition_names)
 
-    generator = Generator(model, name_map)
+    generator = Generator(model, name_map, field_placeholders)
     node_order = generator.build_node_order()
 
-    emitters = {
-        "A": generator.emit_alias,
-        "S": generator.emit_struct,
-        "E": generator.emit_enum,
-    }
-    body_blocks = [emitters[kind](name) for kind, name in node_order]
-
-    body_blocks.extend(emit_extra_param_structs(extra_params, name_map))
-    body_blocks.append(
-        emit_method_traits(
-            generator,
-            model.requests,
-            model.notifications,
-            extra_params,
-            name_map,
-        )
-    )
-
-    lines: list[str] = ["#pragma once", ""]
-    lines.append(f'#include "{TS_HEADER_INCLUDE}"')
-    lines.extend(
-        [
-            "",
-            f"// Generated by {SOURCE_TAG}. DO NOT EDIT.",
-            "",
-            f"namespace {GENERATED_NAMESPACE} {{",
-            "",
-        ]
-    )
-
-    for idx, block in enumerate(body_blocks):
-        if not block:
-            continue
-        if idx > 0:
-            lines.append("")
-        lines.append(block.rstrip())
-
-    lines.extend(["", f"}}  // namespace {GENERATED_NAMESPACE}", ""])
-    content = "\n".join(lines)
+    # Stream blocks straight into a sibling temp file (each block is separated
+    # by one blank line) and only replace the header once generation succeeded.
     output_file.parent.mkdir(parents=True, exist_ok=True)
-    output_file.write_text(content.rstrip() + "\n", encoding="utf-8")
+    temp_file = output_file.with_name(f"{output_file.name}.tmp")
+    try:
+        with temp_file.open("w", encoding="utf-8", buffering=1 << 16) as out:
+            out.write(
+                "#pragma once\n"
+                "\n"
+                f'#include "{TS_HEADER_INCLUDE}"\n'
+                "\n"
+                f"// Generated by {SOURCE_TAG}. DO NOT EDIT.\n"
+                "\n"
+                f"namespace {GENERATED_NAMESPACE} {{\n"
+            )
+            for node in node_order:
+                out.write("\n")
+                generator.emit_node(node, out)
+
+            emit_extra_param_structs(extra_params, name_map, out)
+            out.write("\n")
+            emit_method_traits(
+                generator,
+                model.requests,
+                model.notifications,
+                extra_params,
+                name_map,
+                out,
+            )
+            out.write(f"\n}}  // namespace {GENERATED_NAMESPACE}\n")
+        temp_file.replace(output_file)
+    except BaseException:
+        temp_file.unlink(missing_ok=True)
+        raise
 
     return {
         "struct_count": len(model.structures),
         "enum_count": len(model.enumerations),
         "alias_count": len(model.aliases),
         "output_file": str(output_file),
-        "keyword_hits": generator.keyword_hits,
-        "bool_warnings": generator.bool_default_warnings,
-        "unsafe_overrides": generator.unsafe_override_warnings,
-        "member_collisions": generator.member_collision_warnings,
+        "keyword_hit_count": generator.keyword_hit_count,
+        "bool_warning_count": generator.bool_warning_count,
+        "unsafe_override_count": generator.unsafe_override_count,
+        "member_collision_count": generator.member_collision_count,
     }
 
 
@@ -1450,13 +1651,33 @@ def parse_args() -> argparse.Namespace:
         default=pathlib.Path("include/kota/ipc/lsp/protocol.h"),
         help="Path to generated protocol header file (default: %(default)s)",
     )
+    parser.add_argument(
+        "--no-field-placeholder",
+        dest="field_placeholder",
+        action="store_false",
+        help="Omit the `Schema field: ...` placeholder comment on undocumented "
+        "members (inherited members keep their `Inherited from` note)",
+    )
+    parser.add_argument(
+        "--refresh-schema",
+        action="store_true",
+        help="Revalidate an existing schema file against the remote copy",
+    )
     return parser.parse_args()
 
 
+def configure_logging() -> None:
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
 def main() -> int:
     args = parse_args()
 
-    if not args.schema.exists():
+    if args.refresh_schema or not args.schema.exists():
         try:
             fetch_summary = fetch_schema(output=args.schema, version=args.version)
         except RuntimeError as exc:
@@ -1467,14 +1688,23 @@ def main() -> int:
         if schema_version:
             print(f"[fetch_schema] schema metaData.version={schema_version}")
         print(f"[fetch_schema] source={fetch_summary['source']}")
-        print(
-            f"[fetch_schema] wrote {fetch_summary['bytes']} bytes -> {fetch_summary['output']}"
-        )
-
-    summary = generate_protocol_header(schema_path=args.schema, output_file=args.output)
+        if fetch_summary["not_modified"]:
+            print(f"[fetch_schema] not modified, reusing {fetch_summary['output']}")
+        else:
+            print(
+                f"[fetch_schema] wrote {fetch_summary['bytes']} bytes -> {fetch_summary['output']}"
+            )
 
+    # Diagnostics stream while the header is generated, so they land between
+    # the input/output lines and the final counts.
     print(f"[codegen] input={args.schema}")
-    print(f"[codegen] output_file={summary['output_file']}")
+    print(f"[codegen] output_file={args.output}")
+    summary = generate_protocol_header(
+        schema_path=args.schema,
+        output_file=args.output,
+        field_placeholders=args.field_placeholder,
+    )
+
     print(
         "[codegen] counts="
         f" structs={summary['struct_count']}"
@@ -1482,32 +1712,22 @@ def main() -> int:
         f" aliases={summary['alias_count']}"
         " files=1"
     )
+    print(
+        "[codegen] diagnostics="
+        f" keyword_hits={summary['keyword_hit_count']}"
+        f" bool_warnings={summary['bool_warning_count']}"
+        f" unsafe_overrides={summary['unsafe_override_count']}"
+        f" member_collisions={summary['member_collision_count']}"
+    )
 
-    keyword_hits: list[str] = summary["keyword_hits"]  # type: ignore[assignment]
-    if keyword_hits:
-        for hit in keyword_hits:
-            print(f"[INFO] {hit}")
-    else:
+    if not summary["keyword_hit_count"]:
         print("[INFO] no keyword conflicts detected")
-
-    bool_warnings: list[str] = summary["bool_warnings"]  # type: ignore[assignment]
-    if bool_warnings:
-        for warning in bool_warnings:
-            print(f"[WARNING] {warning}")
-    else:
+    if not summary["bool_warning_count"]:
         print("[INFO] no suspicious optional-bool defaults detected")
 
-    unsafe_overrides: list[str] = summary["unsafe_overrides"]  # type: ignore[assignment]
-    for warning in unsafe_overrides:
-        print(f"[WARNING] {warning}")
-
-    collisions: list[str] = summary["member_collisions"]  # type: ignore[assignment]
-    if collisions:
-        for collision in collisions:
-            print(f"[WARNING] {collision}")
-
     return 0
 
 
 if __name__ == "__main__":
+    configure_logging()
     raise SystemExit(main())
@@ -0,0 +1,144 @@
+"""Regression tests for scripts/lsp_codegen.py against a small fixture schema.
+
+The `*.h.expected` files are the generator's output for fixtures/metaModel.json;
+regenerate them only for an intended change to the generated header.
+"""
+
+import http.server
+import importlib.util
+import json
+import logging
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent.parent
+FIXTURES = Path(__file__).parent / "fixtures"
+SCHEMA = FIXTURES / "metaModel.json"
+
+
+def _load_codegen():
+    spec = importlib.util.spec_from_file_location(
+        "lsp_codegen", ROOT / "scripts" / "lsp_codegen.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+codegen = _load_codegen()
+
+
+@pytest.mark.parametrize(
+    ("field_placeholders", "expected"),
+    [
+        (True, "protocol.h.expected"),
+        (False, "protocol_no_placeholder.h.expected"),
+    ],
+)
+def test_generated_header_matches_expected(tmp_path, field_placeholders, expected):
+    """Generated header is byte-identical to the checked-in expectation."""
+    output = tmp_path / "protocol.h"
+    codegen.generate_protocol_header(
+        SCHEMA, output, field_placeholders=field_placeholders
+    )
+    assert output.read_bytes() == (FIXTURES / expected).read_bytes()
+    assert [p.name for p in tmp_path.iterdir()] == ["protocol.h"]
+
+
+def test_diagnostics_are_logged_and_counted(tmp_path, caplog):
+    """Every diagnostic category is both logged and counted in the summary."""
+    with caplog.at_level(logging.INFO, logger="lsp_codegen"):
+        summary = codegen.generate_protocol_header(SCHEMA, tmp_path / "protocol.h")
+
+    assert summary["keyword_hit_count"] == 1
+    assert summary["bool_warning_count"] == 1
+    assert summary["unsafe_override_count"] == 1
+    assert summary["member_collision_count"] == 1
+    messages = [record.getMessage() for record in caplog.records]
+    assert "ClientOptions.class: renamed to `class_` due to C++ keyword collision." in (
+        messages
+    )
+    assert len(messages) == 4
+
+
+def test_failed_generation_keeps_previous_header(tmp_path, monkeypatch):
+    """A failure mid-emission leaves the old header and no temp file behind."""
+    output = tmp_path / "protocol.h"
+    output.write_text("previous\n", encoding="utf-8")
+
+    def fail(self, node, out):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(codegen.Generator, "emit_node", fail)
+    with pytest.raises(RuntimeError, match="boom"):
+        codegen.generate_protocol_header(SCHEMA, output)
+
+    assert output.read_text(encoding="utf-8") == "previous\n"
+    assert [p.name for p in tmp_path.iterdir()] == ["protocol.h"]
+
+
+class _SchemaHandler(http.server.BaseHTTPRequestHandler):
+    requests: list[tuple[str, str | None, str | None]] = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        version = self.path.strip("/").split(".")[0]
+        etag = f'"{version}"'
+        if_none_match = self.headers.get("If-None-Match")
+        self.requests.append(
+            (version, if_none_match, self.headers.get("If-Modified-Since"))
+        )
+        if if_none_match == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = json.dumps({"metaData": {"version": version}}).encode()
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", "Mon, 01 Jan 2024 00:00:00 GMT")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def schema_server(monkeypatch):
+    """Serve `/<version>.json` locally and point fetch_schema at it."""
+    _SchemaHandler.requests = []
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _SchemaHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(
+        codegen,
+        "DEFAULT_FETCH_URL",
+        f"http://127.0.0.1:{server.server_address[1]}/{{version}}.json",
+    )
+    yield _SchemaHandler.requests
+    server.shutdown()
+    server.server_close()
+
+
+def test_refresh_revalidates_only_the_same_source(tmp_path, schema_server):
+    """Cached validators are reused for the same URL and ignored for another."""
+    output = tmp_path / "schema.json"
+
+    first = codegen.fetch_schema(output, version="a")
+    again = codegen.fetch_schema(output, version="a")
+    other = codegen.fetch_schema(output, version="b")
+
+    assert not first["not_modified"]
+    assert again["not_modified"]
+    assert not other["not_modified"]
+    assert other["schema_version"] == "b"
+    assert schema_server == [
+        ("a", None, None),
+        ("a", '"a"', "Mon, 01 Jan 2024 00:00:00 GMT"),
+        ("b", None, None),
+    ]